@@ -1,75 +1,95 @@
+import argparse
 import json
 import os
 import re
+import sys
 from datetime import datetime
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.units import inch
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.fonts import addMapping
-import platform
-
-# Load environment variables
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-    print("✅ Environment variables loaded from .env file")
-except ImportError:
-    print("⚠️  python-dotenv not installed, using system environment variables only")
-except Exception as e:
-    print(f"⚠️  Could not load .env file: {e}")
+
+# ReportLab and python-dotenv are imported lazily by the code paths that need
+# them, so quick runs (stats, text export) don't pay for PDF/font setup.
+
+def load_environment():
+    """Load environment variables from .env file if python-dotenv is available"""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+        print("✅ Environment variables loaded from .env file")
+    except ImportError:
+        print("⚠️  python-dotenv not installed, using system environment variables only")
+    except Exception as e:
+        print(f"⚠️  Could not load .env file: {e}")
 
 # Configuration from environment variables with defaults
 class Config:
     """Configuration class that loads settings from environment variables"""
-    
-    # Input/Output settings
-    INPUT_FILE = os.getenv('INPUT_FILE', 'result.json')
-    OUTPUT_DIR = os.getenv('OUTPUT_DIR', 'chats_clean_pdf')
-    METADATA_DIR = os.getenv('METADATA_DIR', 'metadata')
-    METADATA_FILE = os.getenv('METADATA_FILE', 'metadata_summary.json')
-    
-    # User identification
-    USER_NAME = os.getenv('USER_NAME', 'Your Name')
-    USER_ID = os.getenv('USER_ID', 'user123456789')
-    
-    # PDF generation settings
-    MAX_FILE_SIZE_KB = int(os.getenv('MAX_FILE_SIZE_KB', '200'))
-    MAX_MESSAGE_LENGTH = int(os.getenv('MAX_MESSAGE_LENGTH', '500'))
-    PDF_FONT_SIZE = int(os.getenv('PDF_FONT_SIZE', '10'))
-    PDF_LINE_SPACING = int(os.getenv('PDF_LINE_SPACING', '12'))
-    PDF_MARGIN_TOP = int(os.getenv('PDF_MARGIN_TOP', '40'))
-    PDF_MARGIN_BOTTOM = int(os.getenv('PDF_MARGIN_BOTTOM', '40'))
-    PDF_MARGIN_LEFT = int(os.getenv('PDF_MARGIN_LEFT', '40'))
-    PDF_MARGIN_RIGHT = int(os.getenv('PDF_MARGIN_RIGHT', '40'))
-    
-    # Chunking algorithm settings
-    SHORT_MESSAGE_CHUNK_SIZE = int(os.getenv('CHUNK_SIZE_SHORT', '25'))
-    MEDIUM_MESSAGE_CHUNK_SIZE = int(os.getenv('CHUNK_SIZE_MEDIUM', '18'))
-    LONG_MESSAGE_CHUNK_SIZE = int(os.getenv('CHUNK_SIZE_LONG', '12'))
-    MIN_CHUNKS_PER_FILE = int(os.getenv('MIN_CHUNKS_PER_FILE', '12'))
-    MAX_CHUNKS_PER_FILE = int(os.getenv('MAX_CHUNKS_PER_FILE', '100'))
-    SIZE_ESTIMATION_MULTIPLIER = float(os.getenv('SIZE_ESTIMATION_MULTIPLIER', '0.005'))
-    TARGET_SIZE_PERCENTAGE = float(os.getenv('TARGET_SIZE_PERCENTAGE', '0.8'))
-    
-    # Text processing settings
-    MIN_MESSAGE_LENGTH = int(os.getenv('MIN_MESSAGE_LENGTH', '2'))
-    SHORT_MESSAGE_THRESHOLD = int(os.getenv('SHORT_MESSAGE_THRESHOLD', '50'))
-    LONG_MESSAGE_THRESHOLD = int(os.getenv('LONG_MESSAGE_THRESHOLD', '150'))
-    
-    # Font paths
-    WINDOWS_FONTS = os.getenv('WINDOWS_FONTS', 'C:/Windows/Fonts/arial.ttf,C:/Windows/Fonts/calibri.ttf,C:/Windows/Fonts/tahoma.ttf').split(',')
-    MACOS_FONTS = os.getenv('MACOS_FONTS', '/System/Library/Fonts/Arial.ttf').split(',')
-    LINUX_FONTS = os.getenv('LINUX_FONTS', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf').split(',')
-    DEFAULT_FONT = os.getenv('DEFAULT_FONT', 'Helvetica')
-    
-    # Debug and logging
-    VERBOSE_LOGGING = os.getenv('VERBOSE_LOGGING', 'false').lower() == 'true'
-    SHOW_FONT_INFO = os.getenv('SHOW_FONT_INFO', 'false').lower() == 'true'
-    SHOW_PROGRESS = os.getenv('SHOW_PROGRESS', 'true').lower() == 'true'
+
+    _loaded = False
+
+    @classmethod
+    def ensure_loaded(cls):
+        """Load .env and settings on first use so helpers work without main()"""
+        if not cls._loaded:
+            load_environment()
+            cls.load()
+
+    @classmethod
+    def load(cls):
+        """Read settings from the environment (call after load_environment())"""
+        cls._loaded = True
+
+        # Input/Output settings
+        cls.INPUT_FILE = os.getenv('INPUT_FILE', 'result.json')
+        cls.OUTPUT_DIR = os.getenv('OUTPUT_DIR', 'chats_clean_pdf')
+        cls.METADATA_DIR = os.getenv('METADATA_DIR', 'metadata')
+        cls.METADATA_FILE = os.getenv('METADATA_FILE', 'metadata_summary.json')
+        cls.TEXT_OUTPUT_DIR = os.getenv('TEXT_OUTPUT_DIR', 'chats_clean_txt')
+        cls.TEXT_METADATA_FILE = os.getenv('TEXT_METADATA_FILE', 'metadata_text_summary.json')
+
+        # User identification
+        cls.USER_NAME = os.getenv('USER_NAME', 'Your Name')
+        cls.USER_ID = os.getenv('USER_ID', 'user123456789')
+
+        # PDF generation settings
+        cls.MAX_FILE_SIZE_KB = int(os.getenv('MAX_FILE_SIZE_KB', '200'))
+        cls.MAX_MESSAGE_LENGTH = int(os.getenv('MAX_MESSAGE_LENGTH', '500'))
+        cls.PDF_FONT_SIZE = int(os.getenv('PDF_FONT_SIZE', '10'))
+        cls.PDF_LINE_SPACING = int(os.getenv('PDF_LINE_SPACING', '12'))
+        cls.PDF_MARGIN_TOP = int(os.getenv('PDF_MARGIN_TOP', '40'))
+        cls.PDF_MARGIN_BOTTOM = int(os.getenv('PDF_MARGIN_BOTTOM', '40'))
+        cls.PDF_MARGIN_LEFT = int(os.getenv('PDF_MARGIN_LEFT', '40'))
+        cls.PDF_MARGIN_RIGHT = int(os.getenv('PDF_MARGIN_RIGHT', '40'))
+
+        # Chunking algorithm settings
+        cls.SHORT_MESSAGE_CHUNK_SIZE = int(os.getenv('CHUNK_SIZE_SHORT', '25'))
+        cls.MEDIUM_MESSAGE_CHUNK_SIZE = int(os.getenv('CHUNK_SIZE_MEDIUM', '18'))
+        cls.LONG_MESSAGE_CHUNK_SIZE = int(os.getenv('CHUNK_SIZE_LONG', '12'))
+        cls.MIN_CHUNKS_PER_FILE = int(os.getenv('MIN_CHUNKS_PER_FILE', '12'))
+        cls.MAX_CHUNKS_PER_FILE = int(os.getenv('MAX_CHUNKS_PER_FILE', '100'))
+        cls.SIZE_ESTIMATION_MULTIPLIER = float(os.getenv('SIZE_ESTIMATION_MULTIPLIER', '0.005'))
+        cls.TARGET_SIZE_PERCENTAGE = float(os.getenv('TARGET_SIZE_PERCENTAGE', '0.8'))
+
+        # PDF size prediction for stats (measured on ReportLab output, rounded up
+        # so predictions err on the large side of MAX_FILE_SIZE_KB)
+        cls.PDF_BASE_SIZE_KB = float(os.getenv('PDF_BASE_SIZE_KB', '2'))
+        cls.PDF_EMBEDDED_FONT_KB = float(os.getenv('PDF_EMBEDDED_FONT_KB', '24'))
+        cls.PDF_KB_PER_1000_CHARS = float(os.getenv('PDF_KB_PER_1000_CHARS', '0.62'))
+        cls.PDF_KB_PER_1000_LATIN_CHARS = float(os.getenv('PDF_KB_PER_1000_LATIN_CHARS', '0.42'))
+
+        # Text processing settings
+        cls.MIN_MESSAGE_LENGTH = int(os.getenv('MIN_MESSAGE_LENGTH', '2'))
+        cls.SHORT_MESSAGE_THRESHOLD = int(os.getenv('SHORT_MESSAGE_THRESHOLD', '50'))
+        cls.LONG_MESSAGE_THRESHOLD = int(os.getenv('LONG_MESSAGE_THRESHOLD', '150'))
+
+        # Font paths
+        cls.WINDOWS_FONTS = os.getenv('WINDOWS_FONTS', 'C:/Windows/Fonts/arial.ttf,C:/Windows/Fonts/calibri.ttf,C:/Windows/Fonts/tahoma.ttf').split(',')
+        cls.MACOS_FONTS = os.getenv('MACOS_FONTS', '/System/Library/Fonts/Arial.ttf').split(',')
+        cls.LINUX_FONTS = os.getenv('LINUX_FONTS', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf').split(',')
+        cls.DEFAULT_FONT = os.getenv('DEFAULT_FONT', 'Helvetica')
+
+        # Debug and logging
+        cls.VERBOSE_LOGGING = os.getenv('VERBOSE_LOGGING', 'false').lower() == 'true'
+        cls.SHOW_FONT_INFO = os.getenv('SHOW_FONT_INFO', 'false').lower() == 'true'
+        cls.SHOW_PROGRESS = os.getenv('SHOW_PROGRESS', 'true').lower() == 'true'
 
 def sanitize_filename(name):
     """Clean filename from invalid characters"""
@@ -184,22 +204,33 @@ def extract_text_content(msg):
     
     return text
 
+def get_font_paths():
+    """Return candidate Cyrillic font paths from configuration for this OS"""
+    import platform
+
+    Config.ensure_loaded()
+    system = platform.system().lower()
+    
+    if system == 'windows':
+        font_paths = Config.WINDOWS_FONTS
+    elif system == 'darwin':  # macOS
+        font_paths = Config.MACOS_FONTS
+    else:  # Linux and others
+        font_paths = Config.LINUX_FONTS
+    
+    # Remove any whitespace
+    return [font_path.strip() for font_path in font_paths]
+
 def setup_fonts():
     """Setup fonts for Cyrillic text support"""
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    Config.ensure_loaded()
     try:
         # Get font paths from configuration based on OS
-        system = platform.system().lower()
-        
-        if system == 'windows':
-            font_paths = Config.WINDOWS_FONTS
-        elif system == 'darwin':  # macOS
-            font_paths = Config.MACOS_FONTS
-        else:  # Linux and others
-            font_paths = Config.LINUX_FONTS
-        
         font_registered = False
-        for font_path in font_paths:
-            font_path = font_path.strip()  # Remove any whitespace
+        for font_path in get_font_paths():
             if os.path.exists(font_path):
                 try:
                     pdfmetrics.registerFont(TTFont('CyrillicFont', font_path))
@@ -249,21 +280,19 @@ def extract_person_info(chat_name, messages):
         'telegram_username': telegram_username
     }
 
-def create_optimized_pdf_parts(chat_name, messages, output_dir=None, max_size_kb=None):
-    """Create multiple PDF files if chat is too large, optimized for n8n processing"""
-    # Use configuration values if not provided
-    if output_dir is None:
-        output_dir = Config.OUTPUT_DIR
+def plan_chat_chunks(chat_name, messages, max_size_kb=None):
+    """Group chat messages into text chunks and estimate how many fit in one file
+
+    Returns (all_chunks, max_chunks_per_file, estimated_kb_per_chunk). Pure text
+    processing, so it is shared by the PDF, text export and stats commands.
+    """
+    Config.ensure_loaded()
     if max_size_kb is None:
         max_size_kb = Config.MAX_FILE_SIZE_KB
-        
-    person_info = extract_person_info(chat_name, messages)
-    person_name = person_info['person_name']
+
+    person_name = extract_person_info(chat_name, messages)['person_name']
     total_messages = len(messages)
-    
-    # Setup font for Cyrillic text
-    font_name = setup_fonts()
-    
+
     # Optimized chunk sizing based on content analysis
     avg_msg_length = sum(len(msg.get('text', '')) for msg in messages) / max(len(messages), 1)
     
@@ -309,43 +338,108 @@ def create_optimized_pdf_parts(chat_name, messages, output_dir=None, max_size_kb
             combined_text = " | ".join(chunk_texts)
             all_chunks.append(combined_text)
     
-    # Memory-efficient file creation
+    return all_chunks, max_chunks_per_file, estimated_kb_per_chunk
+
+def estimate_pdf_size_kb(chunks, embeds_font):
+    """Predict PDF file size: fixed overhead, embedded font subset and text cost
+
+    Chunks with Cyrillic (any non-ASCII) text cost about 1.5x more per character
+    than plain Latin ones, since they use the extra font subsets.
+    """
+    Config.ensure_loaded()
+    size_kb = Config.PDF_BASE_SIZE_KB
+    for chunk in chunks:
+        if chunk.isascii():
+            size_kb += len(chunk) / 1000 * Config.PDF_KB_PER_1000_LATIN_CHARS
+        else:
+            size_kb += len(chunk) / 1000 * Config.PDF_KB_PER_1000_CHARS
+    if embeds_font:
+        size_kb += Config.PDF_EMBEDDED_FONT_KB
+    return size_kb
+
+def split_chunks_into_parts(chat_name, all_chunks, max_chunks_per_file, extension='.pdf', base_name=None):
+    """Split chunks into output files, returning a list of (filename, title, chunks)"""
+    if base_name is None:
+        base_name = sanitize_filename(chat_name)
     total_chunks = len(all_chunks)
     if total_chunks <= max_chunks_per_file:
         # Single file
-        success, chunks = create_single_pdf_file(chat_name, all_chunks, output_dir, person_info, total_messages, font_name)
-        return [(f"{sanitize_filename(chat_name)}.pdf", success, chunks)]
-    else:
-        # Multiple files with optimized splitting
-        files_created = []
-        chunks_per_file = max_chunks_per_file
-        file_count = (total_chunks + chunks_per_file - 1) // chunks_per_file
-        
-        for file_idx in range(file_count):
-            start_idx = file_idx * chunks_per_file
-            end_idx = min(start_idx + chunks_per_file, total_chunks)
-            file_chunks = all_chunks[start_idx:end_idx]
-            
-            # Optimized filename generation
-            base_name = sanitize_filename(chat_name)
-            part_filename = f"{base_name}_part{file_idx + 1}of{file_count}.pdf"
-            
-            success, chunks = create_single_pdf_file(
-                f"{chat_name} (Part {file_idx + 1}/{file_count})", 
-                file_chunks, 
-                output_dir, 
-                person_info, 
-                total_messages, 
-                font_name,
-                custom_filename=part_filename
-            )
-            
-            files_created.append((part_filename, success, chunks))
+        return [(f"{base_name}{extension}", chat_name, all_chunks)]
+
+    # Multiple files with optimized splitting
+    parts = []
+    chunks_per_file = max_chunks_per_file
+    file_count = (total_chunks + chunks_per_file - 1) // chunks_per_file
+    
+    for file_idx in range(file_count):
+        start_idx = file_idx * chunks_per_file
+        end_idx = min(start_idx + chunks_per_file, total_chunks)
+        part_filename = f"{base_name}_part{file_idx + 1}of{file_count}{extension}"
+        part_title = f"{chat_name} (Part {file_idx + 1}/{file_count})"
+        parts.append((part_filename, part_title, all_chunks[start_idx:end_idx]))
+    
+    return parts
+
+def create_optimized_pdf_parts(chat_name, messages, output_dir=None, max_size_kb=None, font_name=None, base_name=None):
+    """Create multiple PDF files if chat is too large, optimized for n8n processing"""
+    Config.ensure_loaded()
+    # Use configuration values if not provided
+    if output_dir is None:
+        output_dir = Config.OUTPUT_DIR
+    if font_name is None:
+        # Setup font for Cyrillic text
+        font_name = setup_fonts()
         
-        return files_created
+    person_info = extract_person_info(chat_name, messages)
+    total_messages = len(messages)
+    
+    all_chunks, max_chunks_per_file, _ = plan_chat_chunks(chat_name, messages, max_size_kb)
+    
+    # Memory-efficient file creation
+    files_created = []
+    for filename, title, file_chunks in split_chunks_into_parts(chat_name, all_chunks, max_chunks_per_file, base_name=base_name):
+        success, chunks = create_single_pdf_file(
+            title,
+            file_chunks,
+            output_dir,
+            person_info,
+            total_messages,
+            font_name,
+            custom_filename=filename
+        )
+        files_created.append((filename, success, chunks))
+    
+    return files_created
+
+def create_text_parts(chat_name, messages, output_dir=None, max_size_kb=None, base_name=None):
+    """Write chat chunks to plain text files using the same splitting as the PDFs"""
+    Config.ensure_loaded()
+    if output_dir is None:
+        output_dir = Config.TEXT_OUTPUT_DIR
+
+    all_chunks, max_chunks_per_file, _ = plan_chat_chunks(chat_name, messages, max_size_kb)
+
+    files_created = []
+    for filename, title, file_chunks in split_chunks_into_parts(chat_name, all_chunks, max_chunks_per_file, extension='.txt', base_name=base_name):
+        try:
+            with open(os.path.join(output_dir, filename), 'w', encoding='utf-8') as f:
+                f.write("\n\n".join(file_chunks))
+                f.write("\n")
+            files_created.append((filename, True, len(file_chunks)))
+        except Exception as e:
+            if Config.VERBOSE_LOGGING:
+                print(f"Error creating text file for {title}: {e}")
+            files_created.append((filename, False, 0))
+
+    return files_created
 
 def create_single_pdf_file(chat_name, chunks, output_dir, person_info, total_messages, font_name, custom_filename=None):
     """Create a single PDF file from chunks with person name in metadata"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+    Config.ensure_loaded()
     if custom_filename:
         filename = custom_filename
         filepath = os.path.join(output_dir, filename)
@@ -400,43 +494,165 @@ def create_single_pdf_file(chat_name, chunks, output_dir, person_info, total_mes
             print(f"Error creating PDF for {chat_name}: {e}")
         return False, 0
 
-def process_telegram_chats_optimized(input_file=None):
-    """Main function to process Telegram chats and create optimized PDFs for n8n"""
-    # Use configuration value if not provided
-    if input_file is None:
-        input_file = Config.INPUT_FILE
-    
-    print(f"Creating optimized PDFs for n8n processing (max {Config.MAX_FILE_SIZE_KB}KB per file)...")
-    
+def load_chat_list(input_file):
+    """Load the Telegram export and return its chat list, or None on error"""
     # Load chat data with better error handling
     try:
         with open(input_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
     except FileNotFoundError:
         print(f"❌ Error: {input_file} not found!")
-        return False
+        return None
     except json.JSONDecodeError as e:
         print(f"❌ Error: Invalid JSON in {input_file}: {e}")
-        return False
+        return None
     except Exception as e:
         print(f"❌ Error loading {input_file}: {e}")
-        return False
+        return None
     
     chat_list = data.get('chats', {}).get('list', [])
     if not chat_list:
         print("❌ No chats found in the data!")
+        return None
+    
+    return chat_list
+
+def get_chat_name(chat):
+    """Return display name of a chat, falling back to its id"""
+    return chat.get('name') or f"Chat_{chat.get('id', 'Unknown')}"
+
+def get_file_base_names(chat_list):
+    """Map chat id to output file base name, adding the id when names collide
+
+    Collisions are counted over all personal chats (case-insensitively, for
+    Windows/macOS filesystems), so a --chat run picks the same names as a full run.
+    """
+    personal_chats = [chat for chat in chat_list if chat.get('type') == 'personal_chat']
+    name_counts = {}
+    for chat in personal_chats:
+        key = sanitize_filename(get_chat_name(chat)).lower()
+        name_counts[key] = name_counts.get(key, 0) + 1
+    
+    base_names = {}
+    for chat in personal_chats:
+        base_name = sanitize_filename(get_chat_name(chat))
+        if name_counts[base_name.lower()] > 1:
+            base_name = f"{base_name}_{sanitize_filename(chat.get('id', 'Unknown'))}"
+        base_names[str(chat.get('id'))] = base_name
+    return base_names
+
+def chat_matches(chat, chat_filter):
+    """Check if chat is selected by --chat filter (name, case-insensitive, or id)"""
+    if not chat_filter:
+        return True
+    name = get_chat_name(chat).strip().lower()
+    chat_id = str(chat.get('id', ''))
+    return any(value.strip().lower() == name or value.strip() == chat_id for value in chat_filter)
+
+def collect_chat_messages(messages):
+    """Extract text messages with direction ('>' sent by me, '<' received)"""
+    Config.ensure_loaded()
+    chat_messages = []
+    
+    # Extract and process messages with optimization
+    for msg in messages:
+        if msg.get('type') != 'message':
+            continue
+        
+        text_content = extract_text_content(msg)
+        if not text_content or len(text_content.strip()) < Config.MIN_MESSAGE_LENGTH:
+            continue
+        
+        # Determine message direction (sent by me or received)
+        sender = msg.get('from', 'Unknown')
+        sender_id = msg.get('from_id', '')
+        
+        # Check if message was sent by me or received from chat partner
+        is_from_me = (sender and Config.USER_NAME in sender) or sender_id == Config.USER_ID
+        direction = '>' if is_from_me else '<'
+        
+        # Store essential data with direction
+        chat_messages.append({
+            'text': text_content,
+            'direction': direction
+        })
+    
+    return chat_messages
+
+def save_metadata(summary_data, metadata_path, replace_chats=None):
+    """Save summary for n8n workflow
+
+    When replace_chats is given (a --chat run, mapping chat id to chat name), only
+    existing entries for those chats are replaced and all other entries are kept,
+    so incremental runs don't drop them. Entries are matched by chat id; entries
+    written before chat ids were stored fall back to the chat name.
+
+    If the existing file can't be merged the error is raised and the file is left
+    untouched, since writing only the selected chats would drop all the others.
+    """
+    if replace_chats is not None and os.path.exists(metadata_path):
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            existing = json.load(f)
+        if not isinstance(existing, list):
+            raise ValueError(f"{metadata_path} does not contain a list of entries")
+        replaced_names = set(replace_chats.values())
+        kept = [item for item in existing
+                if not (str(item['chat_id']) in replace_chats if 'chat_id' in item
+                        else item.get('original_chat') in replaced_names)]
+        summary_data = kept + summary_data
+    
+    # Write to a temporary file first so a failed write can't truncate the summary
+    tmp_path = f"{metadata_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(summary_data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, metadata_path)
+
+def process_telegram_chats_optimized(input_file=None, chat_filter=None, text_only=False):
+    """Main function to process Telegram chats and create optimized PDFs for n8n
+
+    With text_only=True the same chunks are written as .txt files instead and
+    ReportLab is never imported.
+    """
+    Config.ensure_loaded()
+    # Use configuration value if not provided
+    if input_file is None:
+        input_file = Config.INPUT_FILE
+    
+    if text_only:
+        output_dir = Config.TEXT_OUTPUT_DIR
+        metadata_file = Config.TEXT_METADATA_FILE
+        file_kind = "text"
+        print(f"Exporting chat text for n8n processing (max {Config.MAX_FILE_SIZE_KB}KB per file)...")
+    else:
+        output_dir = Config.OUTPUT_DIR
+        metadata_file = Config.METADATA_FILE
+        file_kind = "PDF"
+        print(f"Creating optimized PDFs for n8n processing (max {Config.MAX_FILE_SIZE_KB}KB per file)...")
+    
+    chat_list = load_chat_list(input_file)
+    if chat_list is None:
         return False
+    base_names = get_file_base_names(chat_list)
     
     print(f"📂 Found {len(chat_list)} chats to process")
     
+    # Check the filter before creating any directories
+    if chat_filter and not any(chat.get('type') == 'personal_chat' and chat_matches(chat, chat_filter)
+                               for chat in chat_list):
+        print(f"❌ No personal chats matched: {', '.join(chat_filter)}")
+        return False
+    
     # Create output directories
     try:
-        os.makedirs(Config.OUTPUT_DIR, exist_ok=True)
+        os.makedirs(output_dir, exist_ok=True)
         os.makedirs(Config.METADATA_DIR, exist_ok=True)
     except Exception as e:
         print(f"❌ Error creating directories: {e}")
         return False
     
+    # Fonts are registered once per run, not per chat
+    font_name = None if text_only else setup_fonts()
+    
     # Processing counters
     processed_count = 0
     skipped_count = 0
@@ -446,14 +662,18 @@ def process_telegram_chats_optimized(input_file=None):
     
     # Summary data for n8n metadata
     summary_data = []
+    # Chats with at least one file written; only their metadata gets replaced
+    rendered_chats = {}
     
     # Process each chat with progress tracking
     for idx, chat in enumerate(chat_list, 1):
+        if not chat_matches(chat, chat_filter):
+            continue
         if chat.get('type') != 'personal_chat':
             skipped_count += 1
             continue
         
-        chat_name = chat.get('name') or f"Chat_{chat.get('id', 'Unknown')}"
+        chat_name = get_chat_name(chat)
         messages = chat.get('messages', [])
         
         if not messages:
@@ -465,31 +685,7 @@ def process_telegram_chats_optimized(input_file=None):
         if Config.SHOW_PROGRESS:
             print(f"🔄 Processing [{idx}/{len(chat_list)}]: {chat_name} ({len(messages)} messages)")
         
-        chat_messages = []
-        
-        # Extract and process messages with optimization
-        for msg in messages:
-            if msg.get('type') != 'message':
-                continue
-            
-            text_content = extract_text_content(msg)
-            if not text_content or len(text_content.strip()) < Config.MIN_MESSAGE_LENGTH:
-                continue
-            
-            # Determine message direction (sent by me or received)
-            sender = msg.get('from', 'Unknown')
-            sender_id = msg.get('from_id', '')
-            
-            # Check if message was sent by me or received from chat partner
-            is_from_me = (sender and Config.USER_NAME in sender) or sender_id == Config.USER_ID
-            direction = '>' if is_from_me else '<'
-            
-            # Store essential data with direction
-            chat_msg = {
-                'text': text_content,
-                'direction': direction
-            }
-            chat_messages.append(chat_msg)
+        chat_messages = collect_chat_messages(messages)
         
         if not chat_messages:
             if Config.SHOW_PROGRESS:
@@ -497,9 +693,13 @@ def process_telegram_chats_optimized(input_file=None):
             skipped_count += 1
             continue
         
-        # Create clean PDF files (potentially multiple parts)
+        # Create clean output files (potentially multiple parts)
         try:
-            files_created = create_optimized_pdf_parts(chat_name, chat_messages)
+            if text_only:
+                files_created = create_text_parts(chat_name, chat_messages, output_dir, base_name=base_names.get(str(chat.get('id'))))
+            else:
+                files_created = create_optimized_pdf_parts(chat_name, chat_messages, output_dir, font_name=font_name,
+                                                           base_name=base_names.get(str(chat.get('id'))))
         except Exception as e:
             print(f"❌ Error processing {chat_name}: {e}")
             skipped_count += 1
@@ -519,13 +719,14 @@ def process_telegram_chats_optimized(input_file=None):
             # Process each created file
             for filename, success, chunk_count in files_created:
                 if success:
+                    rendered_chats[str(chat.get('id'))] = chat_name
                     total_files += 1
                     total_chunks += chunk_count
                     
                     # Get file size safely
                     try:
-                        pdf_path = os.path.join(Config.OUTPUT_DIR, filename)
-                        file_size = os.path.getsize(pdf_path) / 1024
+                        file_path = os.path.join(output_dir, filename)
+                        file_size = os.path.getsize(file_path) / 1024
                     except:
                         file_size = 0
                     
@@ -548,6 +749,7 @@ def process_telegram_chats_optimized(input_file=None):
                         'last_name': person_info['last_name'],
                         'telegram_username': person_info['telegram_username'],
                         'original_chat': chat_name,
+                        'chat_id': chat.get('id'),
                         'is_multipart': is_multipart,
                         'chunk_count': chunk_count,
                         'file_size_kb': round(file_size, 1),
@@ -557,36 +759,35 @@ def process_telegram_chats_optimized(input_file=None):
                     })
                 else:
                     if Config.SHOW_PROGRESS:
-                        print(f"   ❌ {filename}: Failed to create PDF")
+                        print(f"   ❌ {filename}: Failed to create {file_kind} file")
             
             # Summary for this chat
             if Config.SHOW_PROGRESS:
                 if len(files_created) > 1:
-                    total_size = sum(os.path.getsize(os.path.join(Config.OUTPUT_DIR, f[0])) / 1024 
-                                   for f in files_created if f[1] and os.path.exists(os.path.join(Config.OUTPUT_DIR, f[0])))
+                    total_size = sum(os.path.getsize(os.path.join(output_dir, f[0])) / 1024 
+                                   for f in files_created if f[1] and os.path.exists(os.path.join(output_dir, f[0])))
                     print(f"   📊 Total: {len(chat_messages)} messages (Me:{sent_count}, From {person_info['person_name']}:{received_count}) → {len(files_created)} files ({total_size:.1f} KB)")
                 else:
                     print(f"   📊 Total: {len(chat_messages)} messages (Me:{sent_count}, From {person_info['person_name']}:{received_count})")
         else:
-            print(f"❌ {chat_name}: Failed to create any PDF files")
+            print(f"❌ {chat_name}: Failed to create any {file_kind} files")
             skipped_count += 1
     
     # Save summary for n8n workflow
     try:
-        metadata_path = os.path.join(Config.METADATA_DIR, Config.METADATA_FILE)
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(summary_data, f, ensure_ascii=False, indent=2)
-        print(f"📋 Metadata saved: {Config.METADATA_DIR}/{Config.METADATA_FILE}")
+        metadata_path = os.path.join(Config.METADATA_DIR, metadata_file)
+        save_metadata(summary_data, metadata_path, replace_chats=rendered_chats if chat_filter else None)
+        print(f"📋 Metadata saved: {Config.METADATA_DIR}/{metadata_file}")
     except Exception as e:
-        print(f"⚠️  Warning: Could not save metadata: {e}")
+        print(f"⚠️  Warning: Could not save metadata (existing file left unchanged): {e}")
     
     # Final summary
     print(f"\n🎯 Processing completed successfully!")
-    print(f"📁 Output location: {Config.OUTPUT_DIR}/ directory")
+    print(f"📁 Output location: {output_dir}/ directory")
     print(f"📊 Results:")
     print(f"   ✅ Processed: {processed_count} chats")
     print(f"   ⚠️  Skipped: {skipped_count} chats")
-    print(f"   📄 Created: {total_files} PDF files")
+    print(f"   📄 Created: {total_files} {file_kind} files")
     print(f"   💬 Total messages: {total_messages}")
     print(f"   📦 Total chunks: {total_chunks}")
     
@@ -607,10 +808,11 @@ def process_telegram_chats_optimized(input_file=None):
     print(f"   1. Text Splitter settings: chunk_size=800, overlap=200")
     print(f"   2. Process files in batches of 5-8 for optimal memory usage")
     print(f"   3. Search patterns: 'Me:', 'From [NAME]:', person names")
-    print(f"   4. Use {Config.METADATA_DIR}/{Config.METADATA_FILE} for person identification")
+    print(f"   4. Use {Config.METADATA_DIR}/{metadata_file} for person identification")
     print(f"   5. Vector dimensions: 1536 (OpenAI) or 768 (local models)")
     print(f"   6. Recommended embedding model: text-embedding-ada-002")
-    print(f"   7. PDF text extraction: use 'pdf-parse' node before text splitter")
+    if not text_only:
+        print(f"   7. PDF text extraction: use 'pdf-parse' node before text splitter")
     
     # Show multipart files info
     large_chats = [item for item in summary_data if item['is_multipart']]
@@ -630,28 +832,167 @@ def process_telegram_chats_optimized(input_file=None):
     
     return True
 
-if __name__ == "__main__":
-    # Setup fonts for PDF generation
-    setup_fonts()
+def show_chat_stats(input_file=None, chat_filter=None):
+    """Dry run: report per-chat message counts, predicted parts and sizes
+
+    Uses the same chunking as the render command but writes nothing and never
+    imports ReportLab. Sizes come from estimate_pdf_size_kb(), which includes
+    the embedded font when a configured TTF font exists.
+    """
+    Config.ensure_loaded()
+    if input_file is None:
+        input_file = Config.INPUT_FILE
+    
+    print(f"📊 Dry run: predicting output for {input_file} (max {Config.MAX_FILE_SIZE_KB}KB per file)...")
+    
+    chat_list = load_chat_list(input_file)
+    if chat_list is None:
+        return False
+    base_names = get_file_base_names(chat_list)
+    
+    selected_count = 0
+    skipped_count = 0
+    total_messages = 0
+    total_chunks = 0
+    total_files = 0
+    total_size = 0.0
+    
+    # setup_fonts() embeds a TTF font only if one of the configured paths exists
+    embeds_font = any(os.path.exists(font_path) for font_path in get_font_paths())
+    
+    for chat in chat_list:
+        if chat.get('type') != 'personal_chat' or not chat_matches(chat, chat_filter):
+            continue
+        
+        selected_count += 1
+        chat_name = get_chat_name(chat)
+        chat_messages = collect_chat_messages(chat.get('messages', []))
+        
+        if not chat_messages:
+            print(f"⚠️  {chat_name}: No valid messages")
+            skipped_count += 1
+            continue
+        
+        all_chunks, max_chunks_per_file, _ = plan_chat_chunks(chat_name, chat_messages)
+        parts = split_chunks_into_parts(chat_name, all_chunks, max_chunks_per_file,
+                                        base_name=base_names.get(str(chat.get('id'))))
+        part_sizes = [estimate_pdf_size_kb(file_chunks, embeds_font) for _, _, file_chunks in parts]
+        
+        sent_count = sum(1 for msg in chat_messages if msg['direction'] == '>')
+        received_count = len(chat_messages) - sent_count
+        chat_size = sum(part_sizes)
+        
+        print(f"💬 {chat_name}: {len(chat_messages)} messages (Me:{sent_count}, Received:{received_count}) → {len(all_chunks)} chunks, {len(parts)} file(s), ~{chat_size:.1f} KB")
+        if len(parts) > 1 or Config.VERBOSE_LOGGING:
+            for (filename, _, file_chunks), part_size in zip(parts, part_sizes):
+                print(f"   📄 {filename}: {len(file_chunks)} chunks (~{part_size:.1f} KB)")
+        
+        total_messages += len(chat_messages)
+        total_chunks += len(all_chunks)
+        total_files += len(parts)
+        total_size += chat_size
+    
+    if chat_filter and selected_count == 0:
+        print(f"❌ No personal chats matched: {', '.join(chat_filter)}")
+        return False
+    
+    print(f"\n📊 Predicted results:")
+    print(f"   💬 Chats: {selected_count - skipped_count} ({skipped_count} without valid messages)")
+    print(f"   💬 Total messages: {total_messages}")
+    print(f"   📦 Total chunks: {total_chunks}")
+    print(f"   📄 Files: {total_files} (~{total_size:.1f} KB)")
+    
+    return True
+
+def add_common_arguments(parser, dest_prefix=''):
+    """Add --input/--chat to parser, storing them under dest_prefix"""
+    parser.add_argument('-i', '--input', dest=f'{dest_prefix}input_file', metavar='INPUT_FILE',
+                        help="Telegram export JSON (default: INPUT_FILE or result.json)")
+    parser.add_argument('-c', '--chat', dest=f'{dest_prefix}chat_filter', action='append', metavar='NAME_OR_ID',
+                        help="Only process this chat (by name or id); can be repeated")
+
+def build_arg_parser():
+    """Build command line parser; running without a subcommand renders PDFs"""
+    parser = argparse.ArgumentParser(
+        description="Convert Telegram chat exports into clean PDFs for n8n vector search")
+    # Options may come before or after the subcommand. A subparser parses into a
+    # fresh namespace, so the top-level copies use their own dests and main()
+    # merges the two.
+    add_common_arguments(parser, dest_prefix='top_')
+    parser.add_argument('-o', '--output-dir', dest='top_output_dir', metavar='OUTPUT_DIR',
+                        help="Output directory for render or export-text (default: OUTPUT_DIR or TEXT_OUTPUT_DIR)")
+    
+    subparsers = parser.add_subparsers(dest='command')
+    stats = subparsers.add_parser('stats', aliases=['dry-run'],
+                                  help="Report per-chat messages, predicted parts and estimated PDF sizes without writing files")
+    add_common_arguments(stats)
+    render = subparsers.add_parser('render', help="Create PDF files (default)")
+    add_common_arguments(render)
+    render.add_argument('-o', '--output-dir', help="PDF output directory (default: OUTPUT_DIR)")
+    export_text = subparsers.add_parser('export-text',
+                                        help="Write chunked chat text as .txt files, without PDF rendering")
+    add_common_arguments(export_text)
+    export_text.add_argument('-o', '--output-dir', help="Text output directory (default: TEXT_OUTPUT_DIR)")
+    
+    return parser
+
+def merge_option(parser, args, name, option):
+    """Return option given before or after the subcommand; error if given twice"""
+    top_value = getattr(args, f'top_{name}', None)
+    sub_value = getattr(args, name, None)
+    if top_value is not None and sub_value is not None:
+        parser.error(f"{option} given both before and after the subcommand")
+    return sub_value if sub_value is not None else top_value
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    command = args.command or 'render'
+    input_file = merge_option(parser, args, 'input_file', '--input')
+    output_dir = merge_option(parser, args, 'output_dir', '--output-dir')
+    # --chat is repeatable, so values from both positions are combined
+    chat_filter = (args.top_chat_filter or []) + (getattr(args, 'chat_filter', None) or []) or None
+    
+    if command in ('stats', 'dry-run') and output_dir is not None:
+        parser.error("--output-dir is not used by stats (it writes no files)")
+    
+    load_environment()
+    Config.load()
+    
+    if command in ('stats', 'dry-run'):
+        return 0 if show_chat_stats(input_file, chat_filter) else 1
+    
+    text_only = command == 'export-text'
+    if output_dir:
+        if text_only:
+            Config.TEXT_OUTPUT_DIR = output_dir
+        else:
+            Config.OUTPUT_DIR = output_dir
     
     # Process chats with configuration settings
     if Config.VERBOSE_LOGGING:
         print(f"🔧 Configuration loaded:")
-        print(f"   Input file: {Config.INPUT_FILE}")
-        print(f"   Output directory: {Config.OUTPUT_DIR}")
+        print(f"   Input file: {input_file or Config.INPUT_FILE}")
+        print(f"   Output directory: {Config.TEXT_OUTPUT_DIR if text_only else Config.OUTPUT_DIR}")
         print(f"   Max file size: {Config.MAX_FILE_SIZE_KB}KB")
         print(f"   User: {Config.USER_NAME} (ID: {Config.USER_ID})")
         print(f"   Font: {Config.DEFAULT_FONT}")
         print()
     
     # Run the main processing function
-    success = process_telegram_chats_optimized()
+    success = process_telegram_chats_optimized(input_file, chat_filter, text_only=text_only)
+    output_dir = Config.TEXT_OUTPUT_DIR if text_only else Config.OUTPUT_DIR
     
     if not success:
         print("\n❌ Processing failed!")
-        exit(1)
-    else:
-        print("\n✅ All done! Ready for n8n processing.")
-        if Config.VERBOSE_LOGGING:
-            print(f"📁 Check {Config.OUTPUT_DIR}/ directory for generated PDFs")
-            print(f"📋 Check {Config.METADATA_DIR}/{Config.METADATA_FILE} for processing metadata") 
\ No newline at end of file
+        return 1
+    
+    print("\n✅ All done! Ready for n8n processing.")
+    if Config.VERBOSE_LOGGING:
+        print(f"📁 Check {output_dir}/ directory for generated files")
+        print(f"📋 Check {Config.METADATA_DIR}/{Config.TEXT_METADATA_FILE if text_only else Config.METADATA_FILE} for processing metadata")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())